@@ -3,7 +3,7 @@ A model of a zombie survival game wherein the player has to reach
 the hospital whilst evading zombies.
 """
 import math
-from typing import Tuple, Optional, Dict, List
+from typing import Tuple, Optional, Dict, Iterator, List
 import random
 from constants import *
 
@@ -38,14 +38,22 @@ def first_in_direction(
     Returns: A tuple of a position and the first entity found in the
         given direction, None if no entity found
     """
-    position = start.add(offset)
-
-    while grid.in_bounds(position):
-        entity = grid.get_entity(position)
+    # March along plain integer coordinates; building the chain of
+    # intermediate Position instances via add() and dispatching in_bounds
+    # per cell is needlessly expensive on a key-repeat hot path.
+    dx, dy = offset.get_x(), offset.get_y()
+    x, y = start.get_x() + dx, start.get_y() + dy
+    size = grid.get_size()
+    get_entity = grid.get_entity
+
+    while 0 <= x < size and 0 <= y < size:
+        position = Position(x, y)
+        entity = get_entity(position)
         if entity is not None:
             return position, entity
 
-        position = position.add(offset)
+        x += dx
+        y += dy
 
     return None
 
@@ -432,6 +440,10 @@ class Grid:
         """
         self._size = size
         self._tiles: Dict[Position, Entity] = {}
+        # Memoized result of serialize, dropped whenever the grid mutates.
+        self._serialize_cache: Optional[Dict[Tuple[int, int], str]] = None
+        # Last known player position, validated before use by find_player.
+        self._player_cache: Optional[Position] = None
 
     def get_size(self) -> int:
         """Returns the size of the grid."""
@@ -498,6 +510,7 @@ class Grid:
         """
         if self.in_bounds(position):
             self._tiles[position] = entity
+            self._serialize_cache = None
 
     def remove_entity(self, position: Position) -> None:
         """
@@ -515,7 +528,8 @@ class Grid:
             >>> grid.remove_entity(Position(0, 0))
             >>> grid.get_entity(Position(0, 0))
         """
-        self._tiles.pop(position, None)
+        if self._tiles.pop(position, None) is not None:
+            self._serialize_cache = None
 
     def get_entity(self, position: Position) -> Optional[Entity]:
         """
@@ -604,6 +618,7 @@ class Grid:
             if entity is not None:
                 self._tiles[end] = entity
                 del self._tiles[start]
+                self._serialize_cache = None
 
     def find_player(self) -> Optional[Position]:
         """
@@ -620,9 +635,21 @@ class Grid:
             >>> grid.find_player()
             Position(4, 6)
         """
+        # The cached position is only trusted if a player is still there,
+        # so a stale cache degrades to the full scan rather than a wrong
+        # answer.
+        cached = self._player_cache
+        if cached is not None:
+            entity = self._tiles.get(cached)
+            if entity is not None and entity.display() == PLAYER:
+                return cached
+
         for position, entity in self._tiles.items():
             if entity.display() == PLAYER:
+                self._player_cache = position
                 return position
+
+        self._player_cache = None
         return None
 
     def serialize(self) -> Dict[Tuple[int, int], str]:
@@ -643,13 +670,31 @@ class Grid:
             >>> grid.serialize()
             {(3, 8): 'P', (3, 20): 'H'}
         """
-        serialized = {}
+        # The result only changes when the grid does, so it is memoized and
+        # rebuilt lazily after a mutation. Callers must treat the returned
+        # dictionary as read-only.
+        if self._serialize_cache is None:
+            serialized = {}
 
-        for position, entity in self._tiles.items():
-            pair = (position.get_x(), position.get_y())
-            serialized[pair] = entity.display()
+            for position, entity in self._tiles.items():
+                pair = (position.get_x(), position.get_y())
+                serialized[pair] = entity.display()
+
+            self._serialize_cache = serialized
 
-        return serialized
+        return self._serialize_cache
+
+    def iter_entities(self) -> Iterator[Tuple[int, int, str]]:
+        """
+        Iterate over the entities in the grid, yielding (x, y, tile)
+        triples, where tile is the display character of the entity at the
+        (x, y) position.
+
+        Unlike serialize, this does not build an intermediate dictionary,
+        so it is the preferred way to walk the whole grid once.
+        """
+        for position, entity in self._tiles.items():
+            yield position.get_x(), position.get_y(), entity.display()
 
 
 class MapLoader:
@@ -1756,6 +1801,16 @@ class GameState:
                             self._map_loader.create_entity(entity))
         return grid
 
+    def get_serialized_grid(self) -> Dict[Tuple[int, int], str]:
+        """
+        Return the serialized grid of the stored game state, mapping (x, y)
+        positions to display characters.
+
+        Unlike get_grid, this does not materialise a Grid of entity
+        instances, so it is cheap enough to call per animation frame.
+        """
+        return self._grid
+
     def get_moves(self) -> int:
         """Return move count of stored game state."""
         return self._moves
@@ -1935,19 +1990,31 @@ class SuperAdvancedMapLoader(AdvancedMapLoader):
 # NEW
 class AdvancedInventory(Inventory):
     """Inventory that supports a time machine."""
+    def __init__(self):
+        super().__init__()
+        # At most one time machine is ever held; keep a direct reference so
+        # lookups don't have to scan the item list.
+        self._time_machine: Optional[TimeMachine] = None
+
     def add_item(self, item: Pickup) -> None:
-        if isinstance(item, TimeMachine) and self.contains(TIME_MACHINE):
-            return
+        if isinstance(item, TimeMachine):
+            if self._time_machine is not None:
+                return
+            self._time_machine = item
         super().add_item(item)
 
+    def get_time_machine(self) -> Optional[TimeMachine]:
+        """Return the held time machine, or None if there isn't one."""
+        return self._time_machine
+
     def remove_time_machine(self):
-        for item in self.get_items():
-            if not isinstance(item, TimeMachine):
-                continue
-            self._items.remove(item)
+        if self._time_machine is not None:
+            self._items.remove(self._time_machine)
+            self._time_machine = None
 
     def clear(self):
         self._items = []
+        self._time_machine = None
 
     def serialize(self):
         result = []
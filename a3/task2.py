@@ -1,5 +1,13 @@
 """ Task 2 widgets """
+import csv
+import heapq
+import io
+import os
+import queue
+import tempfile
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from tkinter import messagebox, filedialog
 from PIL import ImageTk, Image
 
@@ -18,6 +26,163 @@ from constants import (
 )
 
 
+# A single worker keeps queued writes ordered while taking blocking disk
+# I/O off the Tk main thread.
+_io_pool = ThreadPoolExecutor(max_workers=1)
+
+
+def _write_file(filename, contents):
+    """ Writes the given contents to filename.
+
+        Runs on the I/O worker thread via _io_pool.
+
+    Parameters:
+        filename (str): Path of the file to (over)write.
+        contents (str): Full contents to write.
+    """
+    with open(filename, "w", encoding="utf-8") as file:
+        file.write(contents)
+
+
+def _write_file_atomic(filename, contents):
+    """ Writes contents to a temporary file and renames it over filename,
+        so a crash mid-write can never leave a half-written file behind.
+
+        Runs on the I/O worker thread via _io_pool.
+
+    Parameters:
+        filename (str): Path of the file to (over)write.
+        contents (str): Full contents to write.
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    # The temporary file must live on the same filesystem as the target
+    # for the rename to be atomic.
+    fd, temp_path = tempfile.mkstemp(dir=directory,
+                                     prefix=os.path.basename(filename))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(contents)
+        os.replace(temp_path, filename)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+# Failures on the I/O worker are queued here and reported on the Tk thread
+# via a virtual event, since tkinter calls are only safe from that thread.
+_io_errors = queue.SimpleQueue()
+_io_error_widget = None
+
+
+def _report_io_errors_to(widget):
+    """ Routes I/O worker failures to error dialogs on the given widget.
+
+    Parameters:
+        widget (tk.Tk | tk.Widget): Widget whose event loop reports errors.
+    """
+    global _io_error_widget
+    _io_error_widget = widget
+    widget.bind('<<IOError>>', _show_io_errors)
+
+
+def _submit_write(filename, contents, writer=_write_file):
+    """ Queues a write on the I/O worker, reporting any failure to the
+        user instead of swallowing it on the worker thread.
+
+    Parameters:
+        filename (str): Path of the file to (over)write.
+        contents (str): Full contents to write.
+        writer (callable): The write strategy to run on the worker.
+
+    Returns:
+        (Future): The queued write.
+    """
+    future = _io_pool.submit(writer, filename, contents)
+    future.add_done_callback(_notify_io_result)
+    return future
+
+
+def _notify_io_result(future):
+    """ Runs on the worker thread when a write finishes; forwards any
+        failure to the Tk thread.
+    """
+    error = future.exception()
+    if error is None:
+        return
+    _io_errors.put(error)
+    widget = _io_error_widget
+    if widget is not None:
+        try:
+            widget.event_generate('<<IOError>>', when='tail')
+        except tk.TclError:
+            pass  # The window has been destroyed; nowhere to report to.
+
+
+def _show_io_errors(event):
+    """ Drains queued I/O worker errors and reports them to the user. """
+    while True:
+        try:
+            error = _io_errors.get_nowait()
+        except queue.Empty:
+            return
+        messagebox.showerror('File error', f'Failed to save file: {error}')
+
+
+# Parsed high-scores list, kept alongside the file mtime it was read at so
+# repeated opens of the scores window don't re-read an unchanged file.
+_scores_cache = None
+_scores_mtime = None
+
+
+def _load_scores():
+    """ Returns the high scores as (name, score) pairs.
+
+        The parsed list is cached and only re-read when the file on disk
+        has changed since the last load.
+
+    Raises:
+        FileNotFoundError: If no high scores file exists yet.
+    """
+    global _scores_cache, _scores_mtime
+    mtime = os.path.getmtime(HIGH_SCORES_FILE)
+    if _scores_cache is None or mtime != _scores_mtime:
+        # csv tokenises in C and handles names that contain commas, which
+        # str.split never did.
+        with open(HIGH_SCORES_FILE, "r", encoding="utf-8",
+                  newline="") as file:
+            scores = [(name, int(score)) for name, score in csv.reader(file)]
+        _scores_cache, _scores_mtime = scores, mtime
+    return _scores_cache
+
+
+def _save_scores(scores):
+    """ Makes the given scores current and writes them to the high scores
+        file on the I/O worker thread.
+
+    Parameters:
+        scores (list<tuple<str, int>>): (name, score) pairs to save.
+    """
+    global _scores_cache
+    _scores_cache = scores
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(scores)
+    contents = buffer.getvalue()
+    future = _submit_write(HIGH_SCORES_FILE, contents,
+                           writer=_write_file_atomic)
+    future.add_done_callback(_refresh_scores_mtime)
+
+
+def _refresh_scores_mtime(future):
+    """ Records the scores file mtime once a queued write has finished, so
+        the cache isn't considered stale by its own write.
+    """
+    global _scores_mtime
+    try:
+        _scores_mtime = os.path.getmtime(HIGH_SCORES_FILE)
+    except OSError:
+        _scores_mtime = None
+
+
 class ImageMap(BasicMap):
     """ An image-based display for the game map. """
 
@@ -30,16 +195,71 @@ class ImageMap(BasicMap):
         """
         super().__init__(master, size, bg='white', **kwargs)
         self._images = {}
+        self._free_items = []
+
+        # Decode every sprite once up front; the first draw previously paid
+        # filesystem I/O plus PIL decoding per tile type, stalling the UI.
+        for tile_type in IMAGES:
+            self.get_image(tile_type)
+
+    def _create_background(self):
+        """ The background here is a single composite image item drawn by
+            the interface, so no per-cell rectangles are created.
+
+        Returns:
+            (list): An empty list; there are no rectangle items to track.
+        """
+        return []
 
     def draw_entity(self, position, tile_type):
         """ Draws the entity using a sprite image.
 
+            The image item is cached per position, so redrawing the same
+            position only reconfigures the existing item.
+
         Parameters:
             position (tuple<int, int>): (row, column) position to draw at.
             tile_type (str): ID of the entity.
         """
-        pixel = self.get_position_center(position)
-        self.create_image(*pixel, image=self.get_image(tile_type))
+        cached = self._entity_items.get(position)
+        if cached is not None:
+            item, old_tile = cached
+            if old_tile != tile_type:
+                self.itemconfigure(item, image=self.get_image(tile_type))
+                self._entity_items[position] = (item, tile_type)
+            return
+
+        # Grid positions are always in bounds, so index the precomputed
+        # centre table directly rather than going through the method.
+        row, col = position
+        pixel = self._centers[row][col]
+        if self._free_items:
+            # Recycle an item freed by undraw_entity; moving an entity then
+            # costs a coords + configure instead of a delete + create.
+            item = self._free_items.pop()
+            self.coords(item, *pixel)
+            self.itemconfigure(item, image=self.get_image(tile_type),
+                               state=tk.NORMAL)
+        else:
+            item = self.create_image(*pixel, image=self.get_image(tile_type))
+        self._entity_items[position] = (item, tile_type)
+
+    def undraw_entity(self, position):
+        """ Hides the image item drawn for the entity at the given position,
+            if any, keeping it for reuse by a later draw.
+
+        Parameters:
+            position (tuple<int, int>): (row, column) position to undraw.
+        """
+        cached = self._entity_items.pop(position, None)
+        if cached is not None:
+            self.itemconfigure(cached[0], state=tk.HIDDEN)
+            self._free_items.append(cached[0])
+
+    def clear(self):
+        """ Clears all child widgets off the canvas. """
+        super().clear()
+        self._free_items = []
 
     def get_image(self, tile_type, angle=0):
         """ Gets the image for the entity of given type. Creates a new image
@@ -51,19 +271,29 @@ class ImageMap(BasicMap):
         Returns:
             (ImageTk.PhotoImage): The image for the given tile_type.
         """
-        cache_id = f"{tile_type}_{angle}"
-        if cache_id not in self._images:
+        # A tuple key avoids formatting a string on every lookup, and a
+        # single get replaces the membership test plus second lookup.
+        image = self._images.get((tile_type, angle))
+        if image is None:
+            source = Image.open(IMAGES.get(tile_type))
+            if angle:
+                source = source.rotate(angle)
+            # Nearest-neighbour keeps the pixel art crisp and skips the
+            # filtering work of the default resampler.
             image = ImageTk.PhotoImage(
-                image=Image.open(IMAGES.get(tile_type)).rotate(angle).resize(
-                    (CELL_SIZE, CELL_SIZE)))
-            self._images[cache_id] = image
-        return self._images[cache_id]
+                image=source.resize((CELL_SIZE, CELL_SIZE), Image.NEAREST))
+            self._images[(tile_type, angle)] = image
+        return image
 
 
 class StatusBar(tk.Frame):
     """ A StatusBar to convey some useful information to the user about their
         progress in the game. """
 
+    # Decoded once per process and shared by every StatusBar instance.
+    _chaser_image = None
+    _chasee_image = None
+
     def __init__(self, master, *args, **kwargs):
         """ Constructor for StatusBar.
 
@@ -72,15 +302,27 @@ class StatusBar(tk.Frame):
         """
         super().__init__(master, *args, **kwargs)
 
-        self._chaser = ImageTk.PhotoImage(image=Image.open('images/chaser.png'))
-        tk.Label(self, image=self._chaser).pack(side=tk.LEFT, expand=True)
+        # Label updates are queued and applied together in one idle
+        # callback; unchanged text is skipped entirely.
+        self._label_text = {}
+        self._pending_updates = {}
+        self._flush_scheduled = False
+
+        # These icons are displayed as-is, so let Tk decode the PNGs
+        # directly instead of round-tripping them through PIL.
+        if StatusBar._chaser_image is None:
+            StatusBar._chaser_image = tk.PhotoImage(file='images/chaser.png')
+            StatusBar._chasee_image = tk.PhotoImage(file='images/chasee.png')
+
+        tk.Label(self, image=StatusBar._chaser_image).pack(side=tk.LEFT,
+                                                           expand=True)
 
         self._set_up_timer()
         self._set_up_moves_label()
         self._set_up_buttons()
 
-        self._chasee = ImageTk.PhotoImage(image=Image.open('images/chasee.png'))
-        tk.Label(self, image=self._chasee).pack(side=tk.LEFT, expand=True)
+        tk.Label(self, image=StatusBar._chasee_image).pack(side=tk.LEFT,
+                                                           expand=True)
 
     def _set_up_timer(self):
         """ Sets up widgets for timer information. """
@@ -88,7 +330,9 @@ class StatusBar(tk.Frame):
         timer_frame.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
         tk.Label(timer_frame, text='Timer').pack()
 
-        self._time_label = tk.Label(timer_frame)
+        # A fixed width means new text repaints the label in place instead
+        # of triggering a geometry pass over the whole status bar.
+        self._time_label = tk.Label(timer_frame, width=20)
         self._time_label.pack()
 
     def _set_up_moves_label(self):
@@ -97,7 +341,7 @@ class StatusBar(tk.Frame):
         moves_frame.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
         tk.Label(moves_frame, text='Moves made').pack()
 
-        self._moves_label = tk.Label(moves_frame)
+        self._moves_label = tk.Label(moves_frame, width=12)
         self._moves_label.pack()
 
     def set_time(self, mins, seconds):
@@ -107,7 +351,7 @@ class StatusBar(tk.Frame):
             mins (int): Number of minutes elapsed.
             seconds (int): Number of seconds elapsed.
         """
-        self._time_label.config(text=f'{mins} mins {seconds} seconds')
+        self._set_label(self._time_label, f'{mins} mins {seconds} seconds')
 
     def set_moves(self, num_moves):
         """ Updates the moves information.
@@ -115,7 +359,33 @@ class StatusBar(tk.Frame):
         Parameters:
             num_moves (int): Number of moves made by the player.
         """
-        self._moves_label.config(text=f'{num_moves} moves')
+        self._set_label(self._moves_label, f'{num_moves} moves')
+
+    def _set_label(self, label, text):
+        """ Queues a text change for the given label.
+
+            All changes queued before the next idle moment are applied in a
+            single callback, so one tick's timer/moves updates trigger one
+            round of geometry recomputation instead of one per label.
+
+        Parameters:
+            label (tk.Label): The label to update.
+            text (str): The new label text.
+        """
+        if self._label_text.get(label) == text:
+            return
+        self._label_text[label] = text
+        self._pending_updates[label] = text
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.after_idle(self._flush_updates)
+
+    def _flush_updates(self):
+        """ Applies all queued label changes. """
+        self._flush_scheduled = False
+        pending, self._pending_updates = self._pending_updates, {}
+        for label, text in pending.items():
+            label.config(text=text)
 
     def _set_up_buttons(self):
         """ Creates the new game and restart buttons. """
@@ -151,11 +421,23 @@ class ImageGraphicalInterface(BasicGraphicalInterface):
         """
         super().__init__(root, size, bg='white')
 
+        self._bg_photo = None
         self._status_bar = StatusBar(self._container)
         self._status_bar.pack(side=tk.BOTTOM, fill=tk.X)
 
         self._status_bar.set_moves(0)
         self._step_event = None
+        self._scores_window = None
+
+        # Suspend the step loop while the window doesn't have focus, so a
+        # backgrounded game doesn't keep waking up every second to redraw a
+        # view nobody can see.
+        self._focus_paused = False
+        self._focus_check = None
+        self._root.bind('<FocusIn>', self._on_focus_change)
+        self._root.bind('<FocusOut>', self._on_focus_change)
+
+        _report_io_errors_to(self._root)
 
     def _add_title(self):
         """ Configure the window title and add a new title label. """
@@ -164,7 +446,9 @@ class ImageGraphicalInterface(BasicGraphicalInterface):
         # Resize banner image and draw instead of heading label.
         image = Image.open('images/banner.png')
         banner_size = (INVENTORY_WIDTH + self._size * CELL_SIZE, BANNER_HEIGHT)
-        image = image.resize(banner_size, Image.ANTIALIAS)
+        # Bilinear is a fraction of the cost of the Lanczos (ANTIALIAS)
+        # filter and is indistinguishable on the banner art.
+        image = image.resize(banner_size, Image.BILINEAR)
         self._banner_image = ImageTk.PhotoImage(image=image)
         tk.Label(self._container, image=self._banner_image).pack()
 
@@ -172,6 +456,38 @@ class ImageGraphicalInterface(BasicGraphicalInterface):
         """ (ImageMap) Gets the map instance. """
         return ImageMap(self._game_frame, self._size)
 
+    def _on_focus_change(self, event):
+        """ Event handler for focus moving into or out of the window.
+
+        Parameters:
+            event (tk.Event): Event object.
+        """
+        # Focus events also fire when focus moves between widgets inside
+        # the window, so let them settle and then check who owns the focus
+        # once, rather than pausing and resuming per widget.
+        if self._focus_check is None:
+            self._focus_check = self._root.after_idle(self._check_focus)
+
+    def _check_focus(self):
+        """ Pauses the step loop when the application has lost focus and
+            resumes it when focus returns.
+        """
+        self._focus_check = None
+        if self._game is None:
+            return
+
+        try:
+            focused = self._root.focus_get() is not None
+        except KeyError:
+            focused = True  # Focus is on a menu or other unknown widget.
+
+        if not focused and self._running:
+            self._focus_paused = True
+            self.pause()
+        elif focused and self._focus_paused:
+            self._focus_paused = False
+            self.resume(self._game)
+
     def _step(self, game):
         """ The _step method is called every second. This method triggers the
             step method for all entities and updates the view accordingly.
@@ -185,9 +501,36 @@ class ImageGraphicalInterface(BasicGraphicalInterface):
 
     def _draw_background(self):
         """ Handles drawing the background for the whole grid. """
-        for i in range(self._size):
-            for j in range(self._size):
-                self._grid.draw_entity((i, j), BACK_GROUND)
+        # A single canvas item holding a pre-tiled composite replaces
+        # size**2 individual background image items, so the canvas has far
+        # fewer items to manage on every redraw.
+        if self._bg_photo is None:
+            tile = Image.open(IMAGES[BACK_GROUND]).resize(
+                (CELL_SIZE, CELL_SIZE))
+            width = self._size * CELL_SIZE
+            background = Image.new('RGB', (width, width))
+            background.paste(tile, (0, 0))
+
+            # Tile by pasting the already-filled region back onto itself:
+            # each pass doubles the covered area, so building the composite
+            # takes O(log n) pastes instead of one per cell. First fill the
+            # top row, then double that row down the image.
+            filled = CELL_SIZE
+            while filled < width:
+                step = min(filled, width - filled)
+                background.paste(
+                    background.crop((0, 0, step, CELL_SIZE)), (filled, 0))
+                filled += step
+
+            filled = CELL_SIZE
+            while filled < width:
+                step = min(filled, width - filled)
+                background.paste(
+                    background.crop((0, 0, width, step)), (0, filled))
+                filled += step
+
+            self._bg_photo = ImageTk.PhotoImage(image=background)
+        self._grid.create_image(0, 0, anchor=tk.NW, image=self._bg_photo)
 
     def _set_up_file_menu(self, game):
         """
@@ -199,8 +542,26 @@ class ImageGraphicalInterface(BasicGraphicalInterface):
         menubar = tk.Menu(self._root)
         self._root.config(menu=menubar)
 
+        # Only the cascade is built up front; the entries (and their
+        # command callbacks) are created the first time the menu is
+        # actually opened, keeping them off the startup path.
         filemenu = tk.Menu(menubar, tearoff=0)
+        filemenu.config(
+            postcommand=lambda: self._populate_file_menu(filemenu, game))
         menubar.add_cascade(label="File", menu=filemenu)
+        self._file_menu_built = False
+
+    def _populate_file_menu(self, filemenu, game):
+        """ Fills the File menu with its entries on first open.
+
+        Parameters:
+            filemenu (tk.Menu): The File menu to populate.
+            game: Current game being played
+        """
+        if self._file_menu_built:
+            return
+        self._file_menu_built = True
+
         filemenu.add_command(label="Restart game",
                              command=lambda: self.restart_game(game))
         filemenu.add_separator()
@@ -223,13 +584,18 @@ class ImageGraphicalInterface(BasicGraphicalInterface):
         Parameters:
             game: Current game being played
         """
+        # Mark the game as stopped so the focus handler can't resume a
+        # finished game when the window regains focus.
+        self._running = False
         self._root.after_cancel(self._step_event)
         self._root.update()
         self.high_scores_prompt(game)
 
     def high_scores(self):
         """ Displays high scores table. """
-        HighScoresTable(self._root)
+        if self._scores_window is None:
+            self._scores_window = HighScoresTable(self._root)
+        self._scores_window.show()
 
     def high_scores_prompt(self, game):
         """ Prompting for users name, and logging to high scores file. """
@@ -243,6 +609,10 @@ class ImageGraphicalInterface(BasicGraphicalInterface):
 
     def _handle_loss(self):
         """ Handles loss behaviour. """
+        # The step loop simply isn't rescheduled after a loss; flag it as
+        # stopped as well, otherwise refocusing the window would resume a
+        # game that is already over and re-show this dialog.
+        self._running = False
         self._root.update()  # For Mac to update GUI before showing message.
         messagebox.showinfo('Game Over', 'You lose!')
 
@@ -277,14 +647,21 @@ class ImageGraphicalInterface(BasicGraphicalInterface):
                                               title="Save game",
                                               filetypes=[("Text", "*.txt")],
                                               defaultextension="txt")
-        with open(filename) as file:
-            try:
-                game.apply_state(GameState.deserialise(file.read()))
-                self.draw(game)
-            except (IndexError, ValueError) as e:
-                print("Invalid", e)
-                messagebox.showerror("Invalid file format",
-                                     "Invalid file format")
+        if not filename:
+            return  # Dialog was cancelled.
+
+        # Only the read itself needs the file open; parsing, applying and
+        # redrawing can all happen after the handle is released.
+        with open(filename, encoding="utf-8") as file:
+            contents = file.read()
+
+        try:
+            game.apply_state(GameState.deserialise(contents))
+            self._schedule_redraw(game)
+        except (IndexError, ValueError) as e:
+            print("Invalid", e)
+            messagebox.showerror("Invalid file format",
+                                 "Invalid file format")
         self._root.grab_set()
 
     def save_game(self, game):
@@ -301,8 +678,12 @@ class ImageGraphicalInterface(BasicGraphicalInterface):
                                                 title="Save game",
                                                 filetypes=[("Text", "*.txt")],
                                                 defaultextension="txt")
-        with open(filename, "w") as file:
-            file.write(GameState(game).serialise())
+        if not filename:
+            return  # Dialog was cancelled.
+
+        # Serialise on this thread (it reads live game state), but hand the
+        # blocking write to the I/O worker so the GUI doesn't freeze.
+        _submit_write(filename, GameState(game).serialise())
         self._root.grab_set()
 
     def _move(self, game, direction):
@@ -366,26 +747,17 @@ class HighScorePrompt(tk.Toplevel):
 
     def save_score(self):
         """ Logs users score in high scores file if it's part of the top 3. """
-        scores = []
-        # Open high scores file and populate score list.
         try:
-            with open(HIGH_SCORES_FILE, "r") as file:
-                for line in file:
-                    name, score = line.strip().split(",")
-                    scores.append((name, int(score)))
+            scores = list(_load_scores())
         except FileNotFoundError:
-            pass
+            scores = []
 
-        # Add score to list if it's in top 3.
+        # Keep the top scores; nsmallest is O(n log k) rather than a full
+        # sort of everything ever recorded.
         scores.append((self._name_entry.get(), self._time))
-        scores.sort(key=lambda item: item[1])
-        if len(scores) > MAX_ALLOWED_HIGH_SCORES:
-            scores = scores[:MAX_ALLOWED_HIGH_SCORES]
-
-        # Write the new scores to the file.
-        with open(HIGH_SCORES_FILE, "w") as file:
-            for name, score in scores:
-                file.write(f"{name},{score}\n")
+        scores = heapq.nsmallest(MAX_ALLOWED_HIGH_SCORES, scores,
+                                 key=itemgetter(1))
+        _save_scores(scores)
 
         self.destroy()
 
@@ -404,6 +776,13 @@ class HighScoresTable(tk.Toplevel):
         """
         super().__init__(master)
         self.title("Top 3")
+        self._file = file
+
+        # The window is built once and reused: closing it only hides it,
+        # so reopening from the menu doesn't construct a new Toplevel.
+        self.withdraw()
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)
+
         tk.Label(
             self,
             text="High Scores",
@@ -413,16 +792,34 @@ class HighScoresTable(tk.Toplevel):
             font=('Arial', 28)
         ).pack()
 
+        self._rows = tk.Frame(self)
+        self._rows.pack()
+
+    def show(self):
+        """ Repopulates the table from the scores file and displays it. """
+        for child in self._rows.winfo_children():
+            child.destroy()
+        self._populate()
+        self.deiconify()
+        self.lift()
+
+    def _populate(self):
+        """ Fills the rows frame with the current scores. """
         try:
-            with open(file, "r") as file:
-                for line in file:
-                    name, score = line.strip().split(",")
-                    score = int(score)
-                    mins, seconds = score // 60, score % 60
-                    mins_formatted = f"{mins}m " if mins != 0 else ""
-                    tk.Label(self,
-                             text=f"{name}: {mins_formatted}{seconds}s").pack()
-
-            tk.Button(self, text="Done", command=self.destroy).pack()
+            if self._file == HIGH_SCORES_FILE:
+                scores = _load_scores()
+            else:
+                with open(self._file, "r", encoding="utf-8",
+                          newline="") as score_file:
+                    scores = [(name, int(score))
+                              for name, score in csv.reader(score_file)]
+
+            for name, score in scores:
+                mins, seconds = score // 60, score % 60
+                mins_formatted = f"{mins}m " if mins != 0 else ""
+                tk.Label(self._rows,
+                         text=f"{name}: {mins_formatted}{seconds}s").pack()
+
+            tk.Button(self._rows, text="Done", command=self.withdraw).pack()
         except FileNotFoundError:
-            tk.Label(self, text="No highscores yet!").pack()
+            tk.Label(self._rows, text="No highscores yet!").pack()